@@ -4,19 +4,21 @@ Bot handlers for Telegram Location Bot.
 
 import logging
 from typing import Optional
-from telegram import Update
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from src.location_service import LocationService
 
 logger = logging.getLogger(__name__)
 
+NEXT_PLACE_CALLBACK = "next_place"
+
 
 class BotHandlers:
     """Handles Telegram bot interactions."""
     
-    def __init__(self) -> None:
+    def __init__(self, location_service: Optional[LocationService] = None) -> None:
         """Initialize bot handlers."""
-        self.location_service = LocationService()
+        self.location_service = location_service or LocationService()
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle /start command."""
@@ -37,6 +39,7 @@ class BotHandlers:
             "🤖 *Телеграм-бот \"Факты о месте\"*\n\n"
             "Как пользоваться:\n"
             "📍 Отправьте мне свою геолокацию через кнопку \"Поделиться локацией\"\n"
+            "🚶 Или включите трансляцию геолокации — я буду рассказывать о местах по пути\n"
             "🔍 Я найду интересную достопримечательность поблизости\n"
             "📖 Расскажу вам необычный факт об этом месте\n\n"
             "*Команды:*\n"
@@ -67,16 +70,31 @@ class BotHandlers:
         
         try:
             # Process location and get interesting fact
-            result = await self.location_service.process_location(
-                latitude=location.latitude,
-                longitude=location.longitude,
-                user_id=user.id
-            )
+            if location.live_period:
+                # Live location: later updates arrive as edited messages
+                self.location_service.live_tracker.start(update.effective_chat.id)
+                result = await self.location_service.process_live_location(
+                    chat_id=update.effective_chat.id,
+                    latitude=location.latitude,
+                    longitude=location.longitude,
+                    user_id=user.id
+                )
+            else:
+                result = await self.location_service.process_location(
+                    latitude=location.latitude,
+                    longitude=location.longitude,
+                    user_id=user.id,
+                    chat_id=update.effective_chat.id
+                )
             
             if result:
                 # Format and send response
                 response_message = self._format_location_response(result)
-                await processing_message.edit_text(response_message, parse_mode='Markdown')
+                await processing_message.edit_text(
+                    response_message,
+                    parse_mode='Markdown',
+                    reply_markup=self._next_place_keyboard(result)
+                )
                 
                 logger.info(f"Successfully processed location for user {user.id}")
             else:
@@ -95,6 +113,69 @@ class BotHandlers:
                 "Пожалуйста, попробуйте еще раз через несколько минут."
             )
     
+    async def handle_live_location(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle live location updates (edited location messages)."""
+        user = update.effective_user
+        chat_id = update.effective_chat.id
+        message = update.edited_message
+        location = message.location
+        
+        if not location.live_period:
+            # Live location sharing has ended
+            self.location_service.live_tracker.stop(chat_id)
+            logger.info(f"Live location stopped for user {user.id}")
+            return
+        
+        try:
+            result = await self.location_service.process_live_location(
+                chat_id=chat_id,
+                latitude=location.latitude,
+                longitude=location.longitude,
+                user_id=user.id
+            )
+            
+            if result:
+                response_message = self._format_location_response(result)
+                await message.reply_text(response_message, parse_mode='Markdown')
+                logger.info(f"Sent live location update to user {user.id}")
+                
+        except Exception as e:
+            logger.error(f"Error processing live location for user {user.id}: {e}")
+    
+    async def handle_next_place(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle the "next place" button - show the next nearest landmark."""
+        query = update.callback_query
+        user = update.effective_user
+        
+        try:
+            query_id = int(query.data.split(":", 1)[1])
+        except (IndexError, ValueError):
+            await query.answer()
+            return
+        
+        result = await self.location_service.next_place(
+            chat_id=update.effective_chat.id,
+            user_id=user.id,
+            query_id=query_id
+        )
+        
+        if not result:
+            await query.answer(
+                "Больше мест рядом нет. Отправьте локацию ещё раз, чтобы начать поиск заново."
+            )
+            await query.edit_message_reply_markup(reply_markup=None)
+            return
+        
+        await query.answer()
+        # Only the latest message keeps the button
+        await query.edit_message_reply_markup(reply_markup=None)
+        await query.message.reply_text(
+            self._format_location_response(result),
+            parse_mode='Markdown',
+            reply_markup=self._next_place_keyboard(result)
+        )
+        logger.info(f"Sent next place to user {user.id}")
+    
     async def unsupported_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle unsupported message types."""
         await update.message.reply_text(
@@ -117,6 +198,18 @@ class BotHandlers:
                 "Пожалуйста, попробуйте еще раз."
             )
     
+    def _next_place_keyboard(self, result: dict) -> Optional[InlineKeyboardMarkup]:
+        """Build the "next place" button if there are more landmarks nearby."""
+        if not result.get('has_more'):
+            return None
+        
+        return InlineKeyboardMarkup([[
+            InlineKeyboardButton(
+                "➡️ Ещё место рядом",
+                callback_data=f"{NEXT_PLACE_CALLBACK}:{result['query_id']}"
+            )
+        ]])
+    
     def _format_location_response(self, result: dict) -> str:
         """Format the location processing result for user."""
         place_name = result.get('place_name', 'Неизвестное место')
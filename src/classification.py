@@ -0,0 +1,273 @@
+"""
+Data-driven classification of landmarks: place type and city/country detection.
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+from src.geo import haversine_km, KM_PER_DEGREE_LAT
+
+logger = logging.getLogger(__name__)
+
+# Default rules. Order matters: earlier entries win when several keywords match.
+DEFAULT_RULES: Dict[str, Any] = {
+    "default_type": "достопримечательность",
+    "place_types": [
+        {"type": "музей", "keywords": ["музей", "museum"]},
+        {"type": "парк", "keywords": ["парк", "park", "сад", "garden"]},
+        {"type": "памятник", "keywords": ["памятник", "monument"]},
+        {"type": "религиозное строение",
+         "keywords": ["церковь", "собор", "храм", "church", "cathedral"]},
+        {"type": "площадь", "keywords": ["площадь", "square"]},
+        {"type": "театр", "keywords": ["театр", "theater", "theatre"]},
+        {"type": "дворец", "keywords": ["дворец", "palace"]},
+    ],
+    "cities": [
+        {"city": "Москва", "country": "Россия", "keywords": ["москв", "moscow"],
+         "lat": 55.7558, "lon": 37.6173, "radius_km": 35},
+        {"city": "Санкт-Петербург", "country": "Россия", "keywords": ["петербург", "petersburg"],
+         "lat": 59.9343, "lon": 30.3351, "radius_km": 30},
+        {"city": "Париж", "country": "Франция", "keywords": ["париж", "paris"],
+         "lat": 48.8566, "lon": 2.3522, "radius_km": 15},
+        {"city": "Нью-Йорк", "country": "США", "keywords": ["нью-йорк", "new york"],
+         "lat": 40.7128, "lon": -74.0060, "radius_km": 35},
+        {"city": "Рим", "country": "Италия", "keywords": ["рим", "rome"],
+         "lat": 41.9028, "lon": 12.4964, "radius_km": 20},
+    ],
+}
+
+UNKNOWN = "Unknown"
+
+
+def _can_overlap(first: str, second: str) -> bool:
+    """True if occurrences of the two keywords can share characters in a text."""
+    if first in second or second in first:
+        return True
+    shortest = min(len(first), len(second))
+    return any(first.endswith(second[:size]) or second.endswith(first[:size])
+               for size in range(1, shortest))
+
+
+class KeywordMatcher:
+    """Finds the highest-priority keyword group present in a text.
+
+    All keywords are compiled into one alternation (longest first) and the
+    text is scanned once with ``findall``; a dict maps each match back to its
+    group rank. A non-overlapping scan can only miss a keyword that overlaps
+    one it matched, so afterwards just the few keywords that can overlap a
+    keyword of another group, and rank higher than the best match, are
+    checked with a plain substring test. The result is identical to
+    ``any(word in text for word in group)`` evaluated group by group.
+    """
+
+    def __init__(self, groups: List[List[str]]) -> None:
+        """Compile keyword groups; a lower index means higher priority."""
+        self._ranks: Dict[str, int] = {}
+        for rank, words in enumerate(groups):
+            for word in words:
+                self._ranks.setdefault(word.lower(), rank)
+
+        keywords = sorted(self._ranks, key=len, reverse=True)
+        self._pattern = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+
+        # Keywords that a match of another group could hide, by ascending rank
+        hideable = sorted(
+            (rank, word) for word, rank in self._ranks.items()
+            if any(other_rank != rank and _can_overlap(word, other)
+                   for other, other_rank in self._ranks.items())
+        )
+        self._hideable_above = [
+            [(rank, word) for rank, word in hideable if rank < best]
+            for best in range(len(groups))
+        ]
+
+    def _verify(self, text: str, best: int) -> int:
+        for rank, word in self._hideable_above[best]:
+            if word in text:
+                return rank
+        return best
+
+    def best_rank(self, text: str) -> Optional[int]:
+        """Return the highest-priority group rank matching in lowercased text."""
+        if self._pattern is None:
+            return None
+        found = self._pattern.findall(text)
+        if not found:
+            return None
+        return self._verify(text, min(self._ranks[word] for word in found))
+
+
+class ClassificationEngine:
+    """Classifies place type by title and detects city by categories or coordinates."""
+
+    def __init__(self, rules: Optional[Dict[str, Any]] = None) -> None:
+        """Compile classification rules (``DEFAULT_RULES`` if not given)."""
+        rules = rules or DEFAULT_RULES
+        self.default_type: str = rules.get("default_type", DEFAULT_RULES["default_type"])
+        self.place_types: List[str] = [entry["type"] for entry in rules.get("place_types", [])]
+        self.cities: List[Dict[str, Any]] = list(rules.get("cities", []))
+
+        self._type_matcher = KeywordMatcher(
+            [entry["keywords"] for entry in rules.get("place_types", [])]
+        )
+        self._city_matcher = KeywordMatcher(
+            [city.get("keywords", []) for city in self.cities]
+        )
+        # The same categories recur across thousands of articles
+        self._category_rank = lru_cache(maxsize=65536)(
+            lambda cat: self._city_matcher.best_rank(cat.lower())
+        )
+
+        # Gazetteer index: every 1x1 degree cell maps to cities whose radius touches it
+        self._gazetteer: Dict[Tuple[int, int], List[int]] = {}
+        for index, city in enumerate(self.cities):
+            if "lat" not in city or "lon" not in city:
+                continue
+            dlat = city.get("radius_km", 0) / KM_PER_DEGREE_LAT
+            dlon = dlat / max(math.cos(math.radians(city["lat"])), 1e-3)
+            for cell_lat in range(math.floor(city["lat"] - dlat), math.floor(city["lat"] + dlat) + 1):
+                for cell_lon in range(math.floor(city["lon"] - dlon), math.floor(city["lon"] + dlon) + 1):
+                    self._gazetteer.setdefault((cell_lat, cell_lon), []).append(index)
+
+    @classmethod
+    def from_file(cls, path: str) -> "ClassificationEngine":
+        """Load rules from a JSON file with the same shape as ``DEFAULT_RULES``."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def classify_place_type(self, title: str) -> str:
+        """Determine place type from the article title."""
+        rank = self._type_matcher.best_rank(title.lower())
+        return self.default_type if rank is None else self.place_types[rank]
+
+    def city_from_categories(self, categories: List[str]) -> Optional[Dict[str, Any]]:
+        """Return the gazetteer entry named by the first matching category."""
+        if not self.cities:
+            return None
+        for cat in categories:
+            rank = self._category_rank(cat)
+            if rank is not None:
+                return self.cities[rank]
+        return None
+
+    def city_from_coordinates(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        """Return the nearest gazetteer city whose radius covers the point."""
+        nearest = None
+        min_distance = float('inf')
+        for index in self._gazetteer.get((math.floor(lat), math.floor(lon)), ()):
+            city = self.cities[index]
+            distance = haversine_km(lat, lon, city["lat"], city["lon"])
+            if distance <= city.get("radius_km", 0) and distance < min_distance:
+                min_distance = distance
+                nearest = city
+        return nearest
+
+    def detect_location(self, categories: List[str],
+                        coordinates: Optional[Dict[str, float]] = None) -> Tuple[str, str]:
+        """Return (country, city), from categories first, then from coordinates."""
+        city = self.city_from_categories(categories)
+        if city is None and coordinates:
+            city = self.city_from_coordinates(coordinates['lat'], coordinates['lon'])
+        if city is None:
+            return UNKNOWN, UNKNOWN
+        return city.get("country", UNKNOWN), city["city"]
+
+    def reclassify(self, landmark: Dict[str, Any]) -> Dict[str, Any]:
+        """Recompute type, country and city of a dataset record in place."""
+        landmark['type'] = self.classify_place_type(landmark['name'])
+        landmark['country'], landmark['city'] = self.detect_location(
+            landmark.get('categories', []), landmark.get('coordinates')
+        )
+        return landmark
+
+
+def _naive_classify(rules: Dict[str, Any], title: str) -> str:
+    """Reference implementation: linear keyword scan, as the parser used to do."""
+    title_lower = title.lower()
+    for entry in rules["place_types"]:
+        if any(word in title_lower for word in entry["keywords"]):
+            return entry["type"]
+    return rules["default_type"]
+
+
+def _naive_city(rules: Dict[str, Any], categories: List[str]) -> str:
+    """Reference implementation of category-based city detection."""
+    for cat in categories:
+        for city in rules["cities"]:
+            if any(word in cat.lower() for word in city["keywords"]):
+                return city["city"]
+    return UNKNOWN
+
+
+def benchmark(landmarks: List[Dict[str, Any]], rules: Dict[str, Any], repeat: int = 5) -> None:
+    """Compare the compiled engine against the naive scan and check they agree."""
+    engine = ClassificationEngine(rules)
+
+    mismatches = 0
+    for landmark in landmarks:
+        categories = landmark.get('categories', [])
+        engine_city = engine.city_from_categories(categories)
+        if (engine.classify_place_type(landmark['name']) != _naive_classify(rules, landmark['name'])
+                or (engine_city["city"] if engine_city else UNKNOWN) != _naive_city(rules, categories)):
+            mismatches += 1
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for landmark in landmarks:
+            _naive_classify(rules, landmark['name'])
+            _naive_city(rules, landmark.get('categories', []))
+    naive_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for landmark in landmarks:
+            engine.classify_place_type(landmark['name'])
+            engine.city_from_categories(landmark.get('categories', []))
+    engine_time = time.perf_counter() - start
+
+    total = len(landmarks) * repeat
+    print(f"Records: {len(landmarks)} x {repeat}, mismatches: {mismatches}")
+    print(f"Naive scan:      {naive_time:.3f}s ({total / naive_time if naive_time else 0:.0f} rec/s)")
+    print(f"Compiled engine: {engine_time:.3f}s ({total / engine_time if engine_time else 0:.0f} rec/s)")
+
+
+def main() -> None:
+    """CLI for batch reclassification and benchmarking."""
+    parser = argparse.ArgumentParser(description="Reclassify landmarks dataset")
+    parser.add_argument("input", help="Landmarks dataset JSON file")
+    parser.add_argument("--rules", default=None, help="JSON file with classification rules")
+    parser.add_argument("--output", default=None, help="Write reclassified dataset here")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare against the naive keyword scan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    rules = DEFAULT_RULES
+    if args.rules:
+        with open(args.rules, 'r', encoding='utf-8') as f:
+            rules = json.load(f)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        dataset = json.load(f)
+    landmarks = dataset.get('locations', [])
+
+    if args.benchmark:
+        benchmark(landmarks, rules)
+
+    if args.output:
+        engine = ClassificationEngine(rules)
+        for landmark in landmarks:
+            engine.reclassify(landmark)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(dataset, f, ensure_ascii=False, indent=2)
+        logger.info(f"Reclassified {len(landmarks)} landmarks into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,10 @@ class Config:
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
+    # Point at a local OpenAI-compatible stand-in for tests
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")
+    FACT_MAX_TOKENS: int = int(os.getenv("FACT_MAX_TOKENS", "150"))
+    FACT_DESCRIPTION_TOKENS: int = int(os.getenv("FACT_DESCRIPTION_TOKENS", "120"))
     
     # Application Configuration
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
@@ -29,6 +33,43 @@ class Config:
     WEBHOOK_URL: Optional[str] = os.getenv("WEBHOOK_URL")
     PORT: int = int(os.getenv("PORT", "8080"))
     
+    # Landmarks dataset
+    LANDMARKS_PATH: str = os.getenv("LANDMARKS_PATH", "data/test_landmarks.json")
+    
+    # Multi-process webhook mode (WORKERS > 1 together with WEBHOOK_URL)
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
+    WEBHOOK_SECRET: Optional[str] = os.getenv("WEBHOOK_SECRET")
+    METRICS_TOKEN: Optional[str] = os.getenv("METRICS_TOKEN")
+    WORKER_CONCURRENT_UPDATES: int = int(os.getenv("WORKER_CONCURRENT_UPDATES", "64"))
+    WORKER_METRICS_INTERVAL: float = float(os.getenv("WORKER_METRICS_INTERVAL", "10"))
+    WORKER_SHUTDOWN_TIMEOUT: float = float(os.getenv("WORKER_SHUTDOWN_TIMEOUT", "30"))
+    
+    # HTTP connection pools (Telegram, OpenAI, Wikipedia)
+    TELEGRAM_POOL_SIZE: int = int(os.getenv("TELEGRAM_POOL_SIZE", "256"))
+    OPENAI_POOL_SIZE: int = int(os.getenv("OPENAI_POOL_SIZE", "100"))
+    WIKIPEDIA_POOL_SIZE: int = int(os.getenv("WIKIPEDIA_POOL_SIZE", "10"))
+    HTTP_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_KEEPALIVE_CONNECTIONS", "50"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP2: bool = os.getenv("HTTP2", "false").lower() == "true"
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+    HTTP_POOL_TIMEOUT: float = float(os.getenv("HTTP_POOL_TIMEOUT", "10"))
+    HTTP_POOL_STATS_INTERVAL: float = float(os.getenv("HTTP_POOL_STATS_INTERVAL", "300"))
+    
+    # Live location tracking
+    LIVE_LOCATION_MIN_DISTANCE_M: int = int(os.getenv("LIVE_LOCATION_MIN_DISTANCE_M", "50"))
+    LIVE_LOCATION_SESSION_TTL: int = int(os.getenv("LIVE_LOCATION_SESSION_TTL", "900"))
+    LIVE_LOCATION_PREFETCH_M: int = int(os.getenv("LIVE_LOCATION_PREFETCH_M", "300"))
+    
+    # "Next place" paging over nearby landmarks
+    NEARBY_PAGE_COUNT: int = int(os.getenv("NEARBY_PAGE_COUNT", "5"))
+    NEARBY_CURSOR_TTL: int = int(os.getenv("NEARBY_CURSOR_TTL", "1800"))
+    NEARBY_CURSOR_MAX: int = int(os.getenv("NEARBY_CURSOR_MAX", "10000"))
+    
+    # Generated facts cache
+    FACT_CACHE_SIZE: int = int(os.getenv("FACT_CACHE_SIZE", "1000"))
+    FACT_CACHE_TTL: int = int(os.getenv("FACT_CACHE_TTL", "3600"))
+    
     @classmethod
     def validate(cls) -> None:
         """Validate required configuration."""
@@ -68,6 +109,7 @@ except ValueError as e:
     print("- OPENAI_API_KEY=your_openai_api_key")
     print("\nOptional environment variables:")
     print("- OPENAI_MODEL=gpt-4.1-mini (default)")
+    print("- OPENAI_BASE_URL=http://localhost:8000/v1 (local OpenAI-compatible server)")
     print("- DEBUG=false")
     print("- LOG_LEVEL=INFO")
     print("- WEBHOOK_URL=your_webhook_url (for production)")
@@ -0,0 +1,145 @@
+"""
+Streaming near-duplicate detection for landmark datasets.
+"""
+
+import logging
+import math
+import re
+from typing import Dict, List, Optional, Any, Tuple
+from src.geo import haversine_km, KM_PER_DEGREE_LAT
+
+logger = logging.getLogger(__name__)
+
+# Same-titled records further apart than this are treated as different places
+TITLE_MATCH_RADIUS_KM = 1.0
+
+
+def normalize_title(title: str) -> str:
+    """Normalize an article title for matching (case, punctuation, ё)."""
+    title = title.lower().replace('ё', 'е')
+    # Drop disambiguation suffixes like "Собор (Москва)"
+    title = re.sub(r'\s*\(.*?\)\s*$', '', title)
+    return re.sub(r'[\W_]+', ' ', title).strip()
+
+
+class LandmarkDeduplicator:
+    """Incrementally merges near-duplicate landmarks.
+
+    Records are added one at a time. A record is a duplicate of an already
+    kept one if it has the same Wikidata ID, the same normalized title within
+    ``TITLE_MATCH_RADIUS_KM``, or lies within ``radius_km`` of it. Title and
+    spatial matches are skipped when both records carry different Wikidata
+    IDs, i.e. are known to be distinct entities.
+    Spatial candidates come from a uniform grid, so each insert only looks at
+    neighbouring cells and the whole pass is near-linear.
+    """
+
+    def __init__(self, radius_km: float = 0.015) -> None:
+        """Initialize deduplicator with the spatial match radius."""
+        self.radius_km = radius_km
+        self.cell_deg = max(radius_km / KM_PER_DEGREE_LAT, 1e-6)
+        self.landmarks: List[Dict[str, Any]] = []
+        self.merged_count = 0
+
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        self._by_wikidata: Dict[str, int] = {}
+        self._by_title: Dict[str, List[int]] = {}
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def _spatial_candidates(self, lat: float, lon: float) -> List[int]:
+        """Indices of kept landmarks in grid cells that may lie within the radius."""
+        row, col = self._cell(lat, lon)
+        # A degree of longitude shrinks towards the poles, so widen the column span
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + self.cell_deg, 90.0))), 1e-3)
+        col_span = min(math.ceil(1 / cos_lat), 360)
+
+        candidates = []
+        for r in range(row - 1, row + 2):
+            for c in range(col - col_span, col + col_span + 1):
+                candidates.extend(self._grid.get((r, c), ()))
+        return candidates
+
+    @staticmethod
+    def _distinct_entities(wikidata_id: Optional[str], other_wikidata_id: Optional[str]) -> bool:
+        """True if both records carry Wikidata IDs and they differ."""
+        return bool(wikidata_id and other_wikidata_id and wikidata_id != other_wikidata_id)
+
+    def _find_duplicate(self, landmark: Dict[str, Any]) -> Optional[int]:
+        lat = landmark['coordinates']['lat']
+        lon = landmark['coordinates']['lon']
+        wikidata_id = landmark.get('wikidata_id')
+
+        if wikidata_id and wikidata_id in self._by_wikidata:
+            return self._by_wikidata[wikidata_id]
+
+        for index in self._by_title.get(normalize_title(landmark['name']), ()):
+            other = self.landmarks[index]
+            if self._distinct_entities(wikidata_id, other.get('wikidata_id')):
+                continue
+            other_coords = other['coordinates']
+            if haversine_km(lat, lon, other_coords['lat'], other_coords['lon']) <= TITLE_MATCH_RADIUS_KM:
+                return index
+
+        for index in self._spatial_candidates(lat, lon):
+            other = self.landmarks[index]
+            if self._distinct_entities(wikidata_id, other.get('wikidata_id')):
+                continue
+            other_coords = other['coordinates']
+            if haversine_km(lat, lon, other_coords['lat'], other_coords['lon']) <= self.radius_km:
+                return index
+
+        return None
+
+    def _merge(self, index: int, duplicate: Dict[str, Any]) -> None:
+        """Fold information from a duplicate record into the kept one."""
+        kept = self.landmarks[index]
+        for category in duplicate.get('categories', []):
+            if category not in kept['categories']:
+                kept['categories'].append(category)
+
+        # The description goes into prompts in the kept record's language
+        description = duplicate.get('description', '')
+        kept_description = kept.get('description', '')
+        same_language = duplicate.get('language') == kept.get('language')
+        if not kept_description or (same_language and len(description) > len(kept_description)):
+            kept['description'] = description or kept_description
+
+        for field in ('country', 'city'):
+            if kept.get(field) == 'Unknown' and duplicate.get(field, 'Unknown') != 'Unknown':
+                kept[field] = duplicate[field]
+
+        if not kept.get('wikidata_id') and duplicate.get('wikidata_id'):
+            kept['wikidata_id'] = duplicate['wikidata_id']
+            self._by_wikidata[duplicate['wikidata_id']] = index
+
+        if duplicate.get('wikipedia_url') and duplicate['wikipedia_url'] != kept.get('wikipedia_url'):
+            alternates = kept.setdefault('alternate_urls', [])
+            if duplicate['wikipedia_url'] not in alternates:
+                alternates.append(duplicate['wikipedia_url'])
+
+    def add(self, landmark: Dict[str, Any]) -> bool:
+        """Add a landmark; return True if it was kept, False if merged into another."""
+        duplicate_of = self._find_duplicate(landmark)
+        if duplicate_of is not None:
+            self._merge(duplicate_of, landmark)
+            self.merged_count += 1
+            logger.info(
+                f"Merged duplicate '{landmark['name']}' into '{self.landmarks[duplicate_of]['name']}'"
+            )
+            return False
+
+        index = len(self.landmarks)
+        self.landmarks.append(landmark)
+
+        coords = landmark['coordinates']
+        self._grid.setdefault(self._cell(coords['lat'], coords['lon']), []).append(index)
+        self._by_title.setdefault(normalize_title(landmark['name']), []).append(index)
+        if landmark.get('wikidata_id'):
+            self._by_wikidata[landmark['wikidata_id']] = index
+        return True
+
+    def results(self) -> List[Dict[str, Any]]:
+        """Return kept landmarks in insertion order."""
+        return self.landmarks
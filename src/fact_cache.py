@@ -0,0 +1,117 @@
+"""
+Bounded caches of generated facts: in-memory, and SQLite-backed for sharing
+between worker processes.
+"""
+
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FactCache:
+    """LRU cache of facts keyed by landmark, with per-entry expiry."""
+
+    def __init__(self, max_size: int = 1000, ttl: float = 3600) -> None:
+        """Initialize cache limits."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached fact or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, fact = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return fact
+
+    def set(self, key: str, fact: str) -> None:
+        """Store a fact, evicting the least recently used entries if full."""
+        self._entries[key] = (time.monotonic(), fact)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedFactCache:
+    """Fact cache in a SQLite file that several processes can use at once.
+
+    Same interface as ``FactCache``. Uses wall-clock time, since entries are
+    compared across processes.
+
+    Calls are synchronous and made from the event loop, so they never wait
+    long for a lock held by another process: after ``busy_timeout`` seconds a
+    locked read is a miss and a locked write is dropped. Losing an entry only
+    costs one extra fact generation.
+    """
+
+    def __init__(self, path: str, max_size: int = 1000, ttl: float = 3600,
+                 busy_timeout: float = 0.05) -> None:
+        """Open (or create) the cache database."""
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._writes = 0
+
+        # Schema setup may wait for another process; lookups must not
+        self._conn = sqlite3.connect(path, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS facts (key TEXT PRIMARY KEY, fact TEXT, stored_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS facts_stored_at ON facts (stored_at)")
+        self._conn.commit()
+        # No fsync per commit: a cache entry lost on power failure is harmless
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached fact or None if missing, expired or the database is locked."""
+        try:
+            row = self._conn.execute(
+                "SELECT fact FROM facts WHERE key = ? AND stored_at >= ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.debug(f"Fact cache read skipped: {e}")
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, fact: str) -> None:
+        """Store a fact; periodically drop expired and excess oldest entries.
+
+        The write is skipped if the database stays locked.
+        """
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO facts (key, fact, stored_at) VALUES (?, ?, ?)",
+                (key, fact, time.time())
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._conn.execute("DELETE FROM facts WHERE stored_at < ?", (time.time() - self.ttl,))
+                self._conn.execute(
+                    "DELETE FROM facts WHERE key NOT IN "
+                    "(SELECT key FROM facts ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_size,)
+                )
+            self._conn.commit()
+        except sqlite3.OperationalError as e:
+            self._conn.rollback()
+            logger.debug(f"Fact cache write skipped: {e}")
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM facts").fetchone()[0]
@@ -0,0 +1,119 @@
+"""
+Persistent HTTP response cache for Wikipedia API requests.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Any
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class CacheMissError(requests.RequestException):
+    """Raised in offline mode when a request is not present in the cache."""
+
+
+class ResponseCache:
+    """SQLite-backed cache of JSON API responses.
+
+    Entries are keyed on the URL plus normalized query parameters. Fresh
+    entries (younger than ``ttl``) are served without touching the network,
+    stale entries are revalidated with ``If-None-Match``/``If-Modified-Since``,
+    and in ``offline`` mode the network is never used at all.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600, offline: bool = False) -> None:
+        """Open (or create) the cache database."""
+        self.path = path
+        self.ttl = ttl
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'network': 0}
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, url TEXT, params TEXT, body TEXT, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> str:
+        """Serialize request parameters into a stable, order-independent form."""
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, bool):
+                # requests sends True as "True"; keep the same spelling
+                value = str(value)
+            normalized[str(name)] = str(value)
+        return json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+
+    def make_key(self, url: str, params: Dict[str, Any]) -> str:
+        """Build a content-addressed key for a request."""
+        raw = f"{url}?{self.normalize_params(params)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get_json(self, session: requests.Session, url: str,
+                 params: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the JSON body for a GET request, using the cache when possible."""
+        key = self.make_key(url, params)
+        row = self._conn.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+            (key,)
+        ).fetchone()
+
+        if row is not None:
+            body, etag, last_modified, fetched_at = row
+            if self.offline or time.time() - fetched_at < self.ttl:
+                self.stats['hits'] += 1
+                return json.loads(body)
+        elif self.offline:
+            self.stats['misses'] += 1
+            raise CacheMissError(f"Offline mode: no cached response for {url} {params}")
+
+        headers = {}
+        if row is not None:
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        self.stats['network'] += 1
+        response = session.get(url, params=params, headers=headers)
+
+        if row is not None and response.status_code == 304:
+            self.stats['revalidated'] += 1
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ? WHERE key = ?",
+                (time.time(), key)
+            )
+            self._conn.commit()
+            return json.loads(body)
+
+        response.raise_for_status()
+        data = response.json()
+        self.stats['misses'] += 1
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses "
+            "(key, url, params, body, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                key, url, self.normalize_params(params),
+                json.dumps(data, ensure_ascii=False),
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                time.time()
+            )
+        )
+        self._conn.commit()
+        return data
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        logger.info(f"Response cache stats: {self.stats}")
+        self._conn.close()
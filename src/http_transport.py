@@ -0,0 +1,156 @@
+"""
+Shared, tuned HTTP transports for Telegram and OpenAI clients.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import AsyncIterator, Callable, Dict, Optional, Any
+import httpx
+import openai
+from telegram.request import HTTPXRequest
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """Connection pool utilisation counters of one client."""
+    max_connections: int
+    requests: int = 0
+    in_flight: int = 0  # requests sent whose response body is not closed yet
+    peak_in_flight: int = 0
+    queued: int = 0  # requests started while every connection was busy (HTTP/1.1 only)
+    errors: int = 0
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body stream that calls ``on_close`` once when it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]) -> None:
+        self._stream = stream
+        self._on_close: Optional[Callable[[], None]] = on_close
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._on_close is not None:
+                self._on_close()
+                self._on_close = None
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that tracks how busy its connection pool is.
+
+    A request holds its connection until the response body is closed, so it
+    stays in flight until then. Under HTTP/2 requests share connections as
+    streams, so a high in-flight count does not mean requests are queued and
+    ``queued`` is not counted.
+    """
+
+    def __init__(self, name: str, limits: httpx.Limits, http2: bool = False, **kwargs: Any) -> None:
+        """Create a pooled transport registered under ``name`` in pool stats."""
+        super().__init__(limits=limits, http2=http2, **kwargs)
+        self.name = name
+        self.http2 = http2
+        self.stats = PoolStats(max_connections=limits.max_connections or 0)
+        self._last_warning = float('-inf')
+        _pool_stats[name] = self.stats
+
+    def _release(self) -> None:
+        self.stats.in_flight -= 1
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self.stats
+        stats.requests += 1
+        if not self.http2 and stats.max_connections and stats.in_flight >= stats.max_connections:
+            stats.queued += 1
+            now = time.monotonic()
+            interval = Config.HTTP_POOL_STATS_INTERVAL
+            if interval > 0 and now - self._last_warning >= interval:
+                self._last_warning = now
+                logger.warning(f"HTTP pool '{self.name}' exhausted, request queued: {asdict(stats)}")
+
+        stats.in_flight += 1
+        stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            stats.errors += 1
+            self._release()
+            raise
+
+        response.stream = _ReleasingStream(response.stream, self._release)
+        return response
+
+
+_pool_stats: Dict[str, PoolStats] = {}
+_openai_client: Optional[openai.AsyncOpenAI] = None
+
+
+def _limits(max_connections: int) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=min(Config.HTTP_KEEPALIVE_CONNECTIONS, max_connections),
+        keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        connect=Config.HTTP_CONNECT_TIMEOUT,
+        read=Config.HTTP_READ_TIMEOUT,
+        write=Config.HTTP_READ_TIMEOUT,
+        pool=Config.HTTP_POOL_TIMEOUT
+    )
+
+
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Return the process-wide OpenAI client with a tuned connection pool."""
+    global _openai_client
+    if _openai_client is None:
+        limits = _limits(Config.OPENAI_POOL_SIZE)
+        http_client = httpx.AsyncClient(
+            transport=InstrumentedTransport("openai", limits, http2=Config.HTTP2),
+            timeout=_timeout()
+        )
+        _openai_client = openai.AsyncOpenAI(
+            api_key=Config.OPENAI_API_KEY,
+            base_url=Config.OPENAI_BASE_URL or None,
+            http_client=http_client
+        )
+    return _openai_client
+
+
+def build_telegram_request(pool_size: Optional[int] = None) -> HTTPXRequest:
+    """Build a Telegram Bot API request object with a tuned, instrumented pool."""
+    pool_size = pool_size or Config.TELEGRAM_POOL_SIZE
+    name = f"telegram-{len([key for key in _pool_stats if key.startswith('telegram')])}"
+    return HTTPXRequest(
+        connection_pool_size=pool_size,
+        connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+        read_timeout=Config.HTTP_READ_TIMEOUT,
+        write_timeout=Config.HTTP_READ_TIMEOUT,
+        pool_timeout=Config.HTTP_POOL_TIMEOUT,
+        http_version="2" if Config.HTTP2 else "1.1",
+        httpx_kwargs={
+            "transport": InstrumentedTransport(name, _limits(pool_size), http2=Config.HTTP2)
+        }
+    )
+
+
+def get_pool_stats() -> Dict[str, Dict[str, int]]:
+    """Snapshot of pool utilisation for every instrumented client."""
+    return {name: asdict(stats) for name, stats in _pool_stats.items()}
+
+
+def log_pool_stats() -> None:
+    """Log pool utilisation of every instrumented client."""
+    for name, stats in get_pool_stats().items():
+        logger.info(f"HTTP pool '{name}': {stats}")
@@ -0,0 +1,85 @@
+"""
+Read-only, memory-mapped landmark index shared between worker processes.
+
+File layout (little-endian):
+    header   magic b"LMIX", uint32 version, uint64 count
+    coords   count x (float64 lat, float64 lon)
+    offsets  count x (uint64 offset, uint64 length) into the records blob
+    records  UTF-8 JSON of every landmark, back to back
+
+Workers scan the coordinate block straight from the shared page cache and
+decode a landmark's JSON only when it is actually returned.
+"""
+
+import json
+import mmap
+import struct
+from typing import Dict, List, Any, Iterator, Tuple
+
+MAGIC = b"LMIX"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQ")
+_COORD = struct.Struct("<dd")
+_OFFSET = struct.Struct("<QQ")
+
+
+def build_index(landmarks: List[Dict[str, Any]], path: str) -> None:
+    """Write landmarks into an index file at ``path``."""
+    count = len(landmarks)
+    records = [json.dumps(landmark, ensure_ascii=False).encode('utf-8') for landmark in landmarks]
+    records_start = _HEADER.size + count * (_COORD.size + _OFFSET.size)
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, count))
+        for landmark in landmarks:
+            f.write(_COORD.pack(landmark['coordinates']['lat'], landmark['coordinates']['lon']))
+
+        offset = records_start
+        for record in records:
+            f.write(_OFFSET.pack(offset, len(record)))
+            offset += len(record)
+
+        for record in records:
+            f.write(record)
+
+
+class LandmarkIndex:
+    """Sequence-like view over an index file built by ``build_index``."""
+
+    def __init__(self, path: str) -> None:
+        """Memory-map the index file read-only."""
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a landmark index (version {VERSION}): {path}")
+
+        coords_end = _HEADER.size + self._count * _COORD.size
+        self._coords = memoryview(self._mmap)[_HEADER.size:coords_end].cast('d')
+        self._offsets_start = coords_end
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset, length = _OFFSET.unpack_from(self._mmap, self._offsets_start + index * _OFFSET.size)
+        return json.loads(self._mmap[offset:offset + length].decode('utf-8'))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._count):
+            yield self[index]
+
+    def iter_coordinates(self) -> Iterator[Tuple[float, float]]:
+        """Yield (lat, lon) of every landmark without decoding records."""
+        coords = self._coords
+        for index in range(0, 2 * self._count, 2):
+            yield coords[index], coords[index + 1]
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._coords.release()
+        self._mmap.close()
@@ -0,0 +1,94 @@
+"""
+Per-chat state for Telegram live location tracking.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from src.geo import haversine_km
+
+
+@dataclass
+class LiveSession:
+    """Movement state of one chat sharing its live location."""
+    last_lat: Optional[float] = None  # position of the last lookup
+    last_lon: Optional[float] = None
+    prev_lat: Optional[float] = None  # position of the lookup before that
+    prev_lon: Optional[float] = None
+    landmark_key: Optional[str] = None  # see location_service.landmark_key
+    updated_at: float = 0.0
+
+
+class LiveLocationTracker:
+    """Decides when a live location update deserves a new nearest-landmark lookup."""
+
+    def __init__(self, min_distance_km: float = 0.05, session_ttl: float = 900) -> None:
+        """Initialize tracker thresholds."""
+        self.min_distance_km = min_distance_km
+        self.session_ttl = session_ttl
+        self.sessions: Dict[int, LiveSession] = {}
+
+    def _prune(self, now: float) -> None:
+        """Drop sessions that have not been updated for ``session_ttl`` seconds."""
+        expired = [chat_id for chat_id, session in self.sessions.items()
+                   if now - session.updated_at > self.session_ttl]
+        for chat_id in expired:
+            del self.sessions[chat_id]
+
+    def start(self, chat_id: int) -> LiveSession:
+        """Start (or restart) tracking a chat."""
+        session = LiveSession(updated_at=time.monotonic())
+        self.sessions[chat_id] = session
+        return session
+
+    def stop(self, chat_id: int) -> None:
+        """Stop tracking a chat."""
+        self.sessions.pop(chat_id, None)
+
+    def should_lookup(self, chat_id: int, lat: float, lon: float) -> bool:
+        """Return True if the chat moved far enough since the last lookup.
+
+        When it did, the position is recorded as the new lookup position.
+        """
+        now = time.monotonic()
+        self._prune(now)
+
+        session = self.sessions.get(chat_id)
+        if session is None:
+            session = self.start(chat_id)
+        session.updated_at = now
+
+        if session.last_lat is not None and session.last_lon is not None:
+            moved = haversine_km(session.last_lat, session.last_lon, lat, lon)
+            if moved < self.min_distance_km:
+                return False
+
+        session.prev_lat, session.prev_lon = session.last_lat, session.last_lon
+        session.last_lat, session.last_lon = lat, lon
+        return True
+
+    def set_landmark(self, chat_id: int, landmark_key: Optional[str]) -> bool:
+        """Record the key of the nearest landmark; return True if it changed."""
+        session = self.sessions.get(chat_id)
+        if session is None:
+            return landmark_key is not None
+
+        changed = session.landmark_key != landmark_key
+        session.landmark_key = landmark_key
+        return changed
+
+    def predict_position(self, chat_id: int, ahead_km: float) -> Optional[Tuple[float, float]]:
+        """Extrapolate where the chat will be after ``ahead_km`` along its heading."""
+        session = self.sessions.get(chat_id)
+        if session is None or session.prev_lat is None or session.prev_lon is None:
+            return None
+
+        step = haversine_km(session.prev_lat, session.prev_lon, session.last_lat, session.last_lon)
+        if step <= 0:
+            return None
+
+        factor = ahead_km / step
+        return (
+            session.last_lat + (session.last_lat - session.prev_lat) * factor,
+            session.last_lon + (session.last_lon - session.prev_lon) * factor,
+        )
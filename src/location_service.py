@@ -2,14 +2,21 @@
 Location processing service integrating Wikipedia API and OpenAI.
 """
 
+import asyncio
+import heapq
 import json
 import logging
-import math
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator, Tuple, Union
 from dataclasses import dataclass
-import openai
 from src.config import Config
+from src.geo import haversine_km
 from src.wikipedia_parser import WikipediaParser
+from src.fact_cache import FactCache, SharedFactCache
+from src.landmark_index import LandmarkIndex
+from src.live_tracking import LiveLocationTracker
+from src.nearby_cursor import CursorStore, NearbyCursor
+from src.http_transport import get_openai_client
+from src.prompts import SYSTEM_MESSAGE, build_landmark_context, get_token_counter, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -24,142 +31,253 @@ class LocationResult:
     wikipedia_url: Optional[str] = None
 
 
+def load_landmarks_dataset(path: str) -> List[Dict[str, Any]]:
+    """Load landmarks dataset from JSON file."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+            return data.get('locations', [])
+    except FileNotFoundError:
+        logger.warning("Landmarks dataset not found. Using empty dataset.")
+        return []
+    except Exception as e:
+        logger.error(f"Error loading landmarks dataset: {e}")
+        return []
+
+
+def prepare_prompt_contexts(landmarks: List[Dict[str, Any]]) -> None:
+    """Precompute token-bounded description snippets and prompt contexts."""
+    encode = get_token_counter(Config.OPENAI_MODEL)
+    for landmark in landmarks:
+        snippet = truncate_to_tokens(
+            landmark.get('description', ''), Config.FACT_DESCRIPTION_TOKENS, encode
+        )
+        landmark['prompt_context'] = build_landmark_context(landmark, snippet)
+
+
+def landmark_key(landmark: Dict[str, Any]) -> str:
+    """Stable identity of a landmark; distinct places may share a name."""
+    if landmark.get('wikidata_id'):
+        return landmark['wikidata_id']
+    if landmark.get('wikipedia_url'):
+        return landmark['wikipedia_url']
+    coordinates = landmark['coordinates']
+    return f"{landmark['name']}@{coordinates['lat']:.5f},{coordinates['lon']:.5f}"
+
+
 class LocationService:
     """Service for processing location and generating interesting facts."""
     
-    def __init__(self) -> None:
-        """Initialize location service."""
+    def __init__(self, landmark_index_path: Optional[str] = None,
+                 fact_cache: Optional[Union[FactCache, SharedFactCache]] = None) -> None:
+        """Initialize location service.
+        
+        Worker processes pass a shared memory-mapped landmark index and fact cache;
+        otherwise the dataset is loaded into memory and facts are cached per process.
+        """
         self.config = Config()
-        self.openai_client = openai.AsyncOpenAI(api_key=self.config.OPENAI_API_KEY)
-        self.wikipedia_parser = WikipediaParser()
+        self.openai_client = get_openai_client()
+        self.wikipedia_parser = WikipediaParser(pool_size=Config.WIKIPEDIA_POOL_SIZE)
+        
+        # Facts reused across live location updates, plus in-flight generations
+        if fact_cache is None:
+            fact_cache = FactCache(self.config.FACT_CACHE_SIZE, self.config.FACT_CACHE_TTL)
+        self.fact_cache = fact_cache
+        self._pending_facts: Dict[str, asyncio.Task] = {}
+        self.live_tracker = LiveLocationTracker(
+            min_distance_km=self.config.LIVE_LOCATION_MIN_DISTANCE_M / 1000,
+            session_ttl=self.config.LIVE_LOCATION_SESSION_TTL
+        )
+        self.cursors = CursorStore(self.config.NEARBY_CURSOR_MAX, self.config.NEARBY_CURSOR_TTL)
+        
+        # Cumulative OpenAI token usage
+        self.token_usage = {'requests': 0, 'prompt_tokens': 0, 'cached_tokens': 0,
+                            'completion_tokens': 0}
         
         # Load landmarks dataset
-        self.landmarks_data = self._load_landmarks_data()
+        self.landmarks_data: Union[List[Dict[str, Any]], LandmarkIndex]
+        if landmark_index_path:
+            # Prompt contexts were precomputed when the index was built
+            self.landmarks_data = LandmarkIndex(landmark_index_path)
+        else:
+            self.landmarks_data = load_landmarks_dataset(self.config.LANDMARKS_PATH)
+            prepare_prompt_contexts(self.landmarks_data)
         
-    def _load_landmarks_data(self) -> List[Dict[str, Any]]:
-        """Load landmarks dataset from JSON file."""
-        try:
-            with open('data/test_landmarks.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('locations', [])
-        except FileNotFoundError:
-            logger.warning("Landmarks dataset not found. Using empty dataset.")
-            return []
-        except Exception as e:
-            logger.error(f"Error loading landmarks dataset: {e}")
-            return []
+    def _iter_coordinates(self) -> Iterator[Tuple[float, float]]:
+        """Yield (lat, lon) of every landmark in dataset order."""
+        if isinstance(self.landmarks_data, LandmarkIndex):
+            return self.landmarks_data.iter_coordinates()
+        return ((landmark['coordinates']['lat'], landmark['coordinates']['lon'])
+                for landmark in self.landmarks_data)
     
     def _calculate_distance(self, lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two coordinates using Haversine formula."""
-        # Convert to radians
-        lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
+        return haversine_km(lat1, lon1, lat2, lon2)
+    
+    def _find_nearest_landmarks(self, latitude: float, longitude: float, count: int,
+                                max_distance: float = 10.0) -> List[Dict[str, Any]]:
+        """Find up to ``count`` nearest landmarks within specified distance, closest first."""
+        in_range = []
+        
+        for index, (landmark_lat, landmark_lon) in enumerate(self._iter_coordinates()):
+            distance = self._calculate_distance(latitude, longitude, landmark_lat, landmark_lon)
+            
+            if distance <= max_distance:
+                in_range.append((distance, index))
         
-        # Haversine formula
-        dlat = lat2 - lat1
-        dlon = lon2 - lon1
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.asin(math.sqrt(a))
-        r = 6371  # Earth radius in kilometers
+        nearest = []
+        for distance, index in heapq.nsmallest(count, in_range):
+            landmark = self.landmarks_data[index].copy()
+            landmark['distance'] = distance
+            nearest.append(landmark)
         
-        return c * r
+        return nearest
     
     def _find_nearest_landmark(self, latitude: float, longitude: float, 
                              max_distance: float = 10.0) -> Optional[Dict[str, Any]]:
         """Find the nearest landmark within specified distance."""
-        nearest_landmark = None
-        min_distance = float('inf')
+        nearest = self._find_nearest_landmarks(latitude, longitude, 1, max_distance)
+        return nearest[0] if nearest else None
+    
+    async def _request_fact(self, landmark: Dict[str, Any]) -> str:
+        """Request a fact about the landmark from OpenAI; errors are raised."""
+        place_name = landmark['name']
+        description = landmark.get('description', '')
         
-        for landmark in self.landmarks_data:
-            landmark_lat = landmark['coordinates']['lat']
-            landmark_lon = landmark['coordinates']['lon']
-            
-            distance = self._calculate_distance(latitude, longitude, landmark_lat, landmark_lon)
-            
-            if distance <= max_distance and distance < min_distance:
-                min_distance = distance
-                nearest_landmark = landmark.copy()
-                nearest_landmark['distance'] = distance
+        # Precomputed at load time; built on the fly only for landmarks added later
+        prompt = landmark.get('prompt_context') or build_landmark_context(
+            landmark,
+            truncate_to_tokens(description, self.config.FACT_DESCRIPTION_TOKENS,
+                               get_token_counter(self.config.OPENAI_MODEL))
+        )
+        
+        response = await self.openai_client.chat.completions.create(
+            model=self.config.OPENAI_MODEL,
+            messages=[
+                SYSTEM_MESSAGE,
+                {"role": "user", "content": prompt}
+            ],
+            max_tokens=self.config.FACT_MAX_TOKENS,
+            temperature=0.7
+        )
+        
+        self._record_token_usage(place_name, response.usage)
+        fact = response.choices[0].message.content.strip()
+        
+        # Log for analysis
+        logger.info(f"Generated fact for {place_name}: {fact[:100]}...")
         
-        return nearest_landmark
+        return fact
     
-    async def _generate_interesting_fact(self, landmark: Dict[str, Any], 
-                                       user_coordinates: Dict[str, float]) -> str:
-        """Generate interesting fact about the landmark using OpenAI."""
-        place_name = landmark['name']
+    def _fallback_fact(self, landmark: Dict[str, Any]) -> str:
+        """Fact text used when OpenAI is unavailable (never cached)."""
         description = landmark.get('description', '')
         place_type = landmark.get('type', 'достопримечательность')
-        country = landmark.get('country', 'Unknown')
-        city = landmark.get('city', 'Unknown')
-        
-        prompt = (
-            f"Ты эксперт по истории и культуре. Расскажи один интересный, необычный "
-            f"или малоизвестный факт о месте '{place_name}' "
-            f"({'в ' + city if city != 'Unknown' else ''}"
-            f"{', ' + country if country != 'Unknown' else ''}).\n\n"
-            f"Тип места: {place_type}\n"
-            f"Краткое описание: {description[:300]}...\n\n"
-            f"Требования:\n"
-            f"- Факт должен быть интересным и увлекательным\n"
-            f"- Длина ответа: 2-3 предложения (максимум 200 символов)\n"
-            f"- Используй простой и понятный язык\n"
-            f"- Начни прямо с факта, без вводных слов\n"
-            f"- Не упоминай координаты или техническую информацию"
-        )
         
-        try:
-            response = await self.openai_client.chat.completions.create(
-                model=self.config.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "Ты увлекательный гид, который знает интересные факты о достопримечательностях."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
-            
-            fact = response.choices[0].message.content.strip()
-            
-            # Log for analysis
-            logger.info(f"Generated fact for {place_name}: {fact[:100]}...")
-            
+        # Fallback to description if OpenAI fails
+        if description:
+            return f"Это {place_type.lower()} {description[:150]}..."
+        else:
+            return f"Это интересное место - {landmark['name']}."
+    
+    def _record_token_usage(self, place_name: str, usage: Any) -> None:
+        """Log prompt/completion token usage of one request and add it to totals."""
+        if usage is None:
+            return
+        
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = getattr(details, 'cached_tokens', 0) or 0
+        
+        self.token_usage['requests'] += 1
+        self.token_usage['prompt_tokens'] += usage.prompt_tokens
+        self.token_usage['cached_tokens'] += cached_tokens
+        self.token_usage['completion_tokens'] += usage.completion_tokens
+        
+        logger.info(
+            f"Token usage for {place_name}: prompt={usage.prompt_tokens} "
+            f"(cached={cached_tokens}), completion={usage.completion_tokens}"
+        )
+    
+    async def get_fact(self, landmark: Dict[str, Any],
+                       user_coordinates: Dict[str, float]) -> str:
+        """Return a cached fact for the landmark, generating it at most once."""
+        fact = self.fact_cache.get(landmark_key(landmark))
+        if fact is not None:
             return fact
-            
-        except Exception as e:
-            logger.error(f"Error generating fact with OpenAI: {e}")
-            
-            # Fallback to description if OpenAI fails
-            if description:
-                return f"Это {place_type.lower()} {description[:150]}..."
-            else:
-                return f"Это интересное место - {place_name}."
+        
+        fact = await self._fact_task(landmark, user_coordinates)
+        return fact if fact is not None else self._fallback_fact(landmark)
+    
+    def prefetch_fact(self, landmark: Dict[str, Any],
+                      user_coordinates: Dict[str, float]) -> None:
+        """Start generating a fact in the background unless it is cached or in flight."""
+        if self.fact_cache.get(landmark_key(landmark)) is None:
+            self._fact_task(landmark, user_coordinates)
+    
+    def _fact_task(self, landmark: Dict[str, Any],
+                   user_coordinates: Dict[str, float]) -> asyncio.Task:
+        """Return the in-flight generation for the landmark, starting one if needed.
+        
+        The task resolves to None if OpenAI fails, so fallback text never
+        reaches the cache.
+        """
+        key = landmark_key(landmark)
+        task = self._pending_facts.get(key)
+        if task is not None:
+            return task
+        
+        async def generate() -> Optional[str]:
+            try:
+                fact = await self._request_fact(landmark)
+                self.fact_cache.set(key, fact)
+                return fact
+            except Exception as e:
+                logger.error(f"Error generating fact with OpenAI: {e}")
+                return None
+            finally:
+                self._pending_facts.pop(key, None)
+        
+        task = asyncio.create_task(generate())
+        self._pending_facts[key] = task
+        return task
+    
+    def _build_result(self, landmark: Dict[str, Any], interesting_fact: str) -> Dict[str, Any]:
+        """Build the result dictionary returned to bot handlers."""
+        return {
+            'place_name': landmark['name'],
+            'distance': landmark['distance'],
+            'coordinates': landmark['coordinates'],
+            'interesting_fact': interesting_fact,
+            'wikipedia_url': landmark.get('wikipedia_url'),
+            'place_type': landmark.get('type', 'достопримечательность')
+        }
     
     async def process_location(self, latitude: float, longitude: float, 
-                             user_id: int) -> Optional[Dict[str, Any]]:
+                             user_id: int, chat_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
         """Process user location and return interesting fact about nearby place."""
         logger.info(f"Processing location for user {user_id}: lat={latitude}, lon={longitude}")
         
-        # Find nearest landmark
-        nearest_landmark = self._find_nearest_landmark(latitude, longitude)
+        # Find nearest landmarks once; further pages are served from the cursor
+        user_coordinates = {'lat': latitude, 'lon': longitude}
+        candidates = self._find_nearest_landmarks(
+            latitude, longitude, self.config.NEARBY_PAGE_COUNT
+        )
         
-        if not nearest_landmark:
+        if not candidates:
             logger.info(f"No landmarks found near {latitude}, {longitude}")
             return None
         
+        cursor = self.cursors.create(
+            chat_id if chat_id is not None else user_id, candidates, user_coordinates
+        )
+        nearest_landmark = cursor.current()
+        
         # Generate interesting fact
         try:
-            interesting_fact = await self._generate_interesting_fact(
-                nearest_landmark, 
-                {'lat': latitude, 'lon': longitude}
-            )
+            self._prefetch_next_page(cursor)
+            interesting_fact = await self.get_fact(nearest_landmark, user_coordinates)
             
-            result = {
-                'place_name': nearest_landmark['name'],
-                'distance': nearest_landmark['distance'],
-                'coordinates': nearest_landmark['coordinates'],
-                'interesting_fact': interesting_fact,
-                'wikipedia_url': nearest_landmark.get('wikipedia_url'),
-                'place_type': nearest_landmark.get('type', 'достопримечательность')
-            }
+            result = self._build_page_result(cursor, interesting_fact)
             
             # Log result for analysis
             self._log_processing_result(user_id, latitude, longitude, result)
@@ -170,6 +288,84 @@ class LocationService:
             logger.error(f"Error processing location for user {user_id}: {e}")
             return None
     
+    async def next_place(self, chat_id: int, user_id: int,
+                         query_id: int) -> Optional[Dict[str, Any]]:
+        """Advance the chat's cursor to the next nearby landmark.
+        
+        Returns None if the cursor expired, belongs to another query or is exhausted.
+        """
+        cursor = self.cursors.get(chat_id)
+        if cursor is None or cursor.query_id != query_id or not cursor.has_more():
+            return None
+        
+        cursor.position += 1
+        landmark = cursor.current()
+        
+        try:
+            self._prefetch_next_page(cursor)
+            interesting_fact = await self.get_fact(landmark, cursor.user_coordinates)
+            result = self._build_page_result(cursor, interesting_fact)
+            self._log_processing_result(
+                user_id, cursor.user_coordinates['lat'], cursor.user_coordinates['lon'], result
+            )
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error processing next place for user {user_id}: {e}")
+            return None
+    
+    def _prefetch_next_page(self, cursor: NearbyCursor) -> None:
+        """Speculatively generate the fact for the next page while the user reads this one."""
+        next_landmark = cursor.peek_next()
+        if next_landmark:
+            self.prefetch_fact(next_landmark, cursor.user_coordinates)
+    
+    def _build_page_result(self, cursor: NearbyCursor, interesting_fact: str) -> Dict[str, Any]:
+        """Build a result for the cursor's current page, with paging info."""
+        result = self._build_result(cursor.current(), interesting_fact)
+        result['query_id'] = cursor.query_id
+        result['has_more'] = cursor.has_more()
+        return result
+    
+    async def process_live_location(self, chat_id: int, latitude: float, longitude: float,
+                                    user_id: int) -> Optional[Dict[str, Any]]:
+        """Process a live location update.
+        
+        Returns a result only when the nearest landmark changed; small movements
+        and updates near the same landmark return None without any LLM call.
+        """
+        if not self.live_tracker.should_lookup(chat_id, latitude, longitude):
+            return None
+        
+        user_coordinates = {'lat': latitude, 'lon': longitude}
+        nearest_landmark = self._find_nearest_landmark(latitude, longitude)
+        changed = self.live_tracker.set_landmark(
+            chat_id, landmark_key(nearest_landmark) if nearest_landmark else None
+        )
+        
+        # Warm up the fact for the landmark the user is heading to
+        predicted = self.live_tracker.predict_position(
+            chat_id, self.config.LIVE_LOCATION_PREFETCH_M / 1000
+        )
+        if predicted:
+            next_landmark = self._find_nearest_landmark(*predicted)
+            if next_landmark and (not nearest_landmark
+                                  or landmark_key(next_landmark) != landmark_key(nearest_landmark)):
+                self.prefetch_fact(next_landmark, user_coordinates)
+        
+        if not changed or not nearest_landmark:
+            return None
+        
+        logger.info(f"Nearest landmark changed for chat {chat_id}: {nearest_landmark['name']}")
+        try:
+            interesting_fact = await self.get_fact(nearest_landmark, user_coordinates)
+            result = self._build_result(nearest_landmark, interesting_fact)
+            self._log_processing_result(user_id, latitude, longitude, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error processing live location for user {user_id}: {e}")
+            return None
+    
     def _log_processing_result(self, user_id: int, lat: float, lon: float, 
                              result: Dict[str, Any]) -> None:
         """Log processing result for analysis."""
@@ -2,26 +2,85 @@
 Main application module for Telegram Location Bot.
 """
 
+import asyncio
 import logging
+from typing import Any, Awaitable, Dict, List, Optional
 from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import (Application, BaseUpdateProcessor, CallbackQueryHandler, CommandHandler,
+                          MessageHandler, filters, ContextTypes)
 from src.config import Config
-from src.bot_handlers import BotHandlers
+from src.bot_handlers import BotHandlers, NEXT_PLACE_CALLBACK
+from src.http_transport import build_telegram_request, log_pool_stats
+from src.location_service import LocationService
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Runs updates of different chats concurrently and those of one chat in order.
+    
+    Live location edits and "next place" presses of a chat depend on the chat's
+    previous update, so they must not overtake each other.
+    """
+    
+    def __init__(self, max_concurrent_updates: int) -> None:
+        """Initialize with the limit on updates processed at once."""
+        super().__init__(max_concurrent_updates)
+        # chat id -> [lock, number of updates holding or waiting for it]
+        self._chats: Dict[int, List[Any]] = {}
+    
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            await coroutine
+            return
+        
+        entry = self._chats.setdefault(chat.id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                await coroutine
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._chats[chat.id]
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+
+
 class TelegramLocationBot:
     """Main Telegram Location Bot class."""
     
-    def __init__(self) -> None:
-        """Initialize the bot."""
+    def __init__(self, location_service: Optional[LocationService] = None,
+                 worker: bool = False) -> None:
+        """Initialize the bot.
+        
+        In worker mode updates are fed in by the webhook dispatcher, so the
+        application has no updater of its own. It handles updates of different
+        chats concurrently, and updates of one chat in order.
+        """
         self.config = Config()
-        self.handlers = BotHandlers()
+        self.handlers = BotHandlers(location_service)
+        self._pool_stats_task: Optional[asyncio.Task] = None
         
         # Create application
-        self.application = Application.builder().token(self.config.TELEGRAM_BOT_TOKEN).build()
+        builder = (
+            Application.builder()
+            .token(self.config.TELEGRAM_BOT_TOKEN)
+            .request(build_telegram_request())
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+        )
+        if worker:
+            builder = builder.updater(None).concurrent_updates(
+                PerChatUpdateProcessor(self.config.WORKER_CONCURRENT_UPDATES)
+            )
+        self.application = builder.build()
         
         # Setup handlers
         self._setup_handlers()
@@ -33,15 +92,40 @@ class TelegramLocationBot:
         self.application.add_handler(CommandHandler("help", self.handlers.help_command))
         
         # Location handler (main functionality)
-        self.application.add_handler(MessageHandler(filters.LOCATION, self.handlers.handle_location))
+        self.application.add_handler(MessageHandler(filters.UpdateType.MESSAGE & filters.LOCATION,
+                                                    self.handlers.handle_location))
+        
+        # Live location updates arrive as edits of the original location message
+        self.application.add_handler(MessageHandler(filters.UpdateType.EDITED_MESSAGE & filters.LOCATION,
+                                                    self.handlers.handle_live_location))
+        
+        # "Next place" button
+        self.application.add_handler(CallbackQueryHandler(self.handlers.handle_next_place,
+                                                          pattern=f"^{NEXT_PLACE_CALLBACK}:"))
         
         # Handle unsupported messages
-        self.application.add_handler(MessageHandler(~filters.LOCATION & ~filters.COMMAND, 
+        self.application.add_handler(MessageHandler(filters.UpdateType.MESSAGE & ~filters.LOCATION & ~filters.COMMAND, 
                                                   self.handlers.unsupported_message))
         
         # Error handler
         self.application.add_error_handler(self.handlers.error_handler)
         
+    async def _post_init(self, application: Application) -> None:
+        """Start periodic reporting of HTTP connection pool utilisation."""
+        if self.config.HTTP_POOL_STATS_INTERVAL > 0:
+            self._pool_stats_task = asyncio.create_task(self._report_pool_stats())
+        
+    async def _report_pool_stats(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.HTTP_POOL_STATS_INTERVAL)
+            log_pool_stats()
+        
+    async def _post_shutdown(self, application: Application) -> None:
+        """Report HTTP connection pool utilisation on shutdown."""
+        if self._pool_stats_task is not None:
+            self._pool_stats_task.cancel()
+        log_pool_stats()
+        
     def run(self) -> None:
         """Run the bot."""
         logger.info("Starting Telegram Location Bot...")
@@ -64,6 +148,15 @@ class TelegramLocationBot:
 def main() -> None:
     """Main entry point."""
     try:
+        if Config.WEBHOOK_URL and Config.WORKERS > 1:
+            # Production mode with webhook, updates spread over worker processes.
+            # Imported here because worker processes import this module.
+            from src.webhook_dispatcher import WebhookDispatcher
+            
+            logger.info(f"Running in webhook mode on {Config.WEBHOOK_URL} with {Config.WORKERS} workers")
+            WebhookDispatcher(Config.WORKERS).run()
+            return
+        
         bot = TelegramLocationBot()
         bot.run()
     except KeyboardInterrupt:
@@ -0,0 +1,66 @@
+"""
+Per-chat cursors over precomputed nearby landmark candidates.
+"""
+
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Any
+
+
+@dataclass
+class NearbyCursor:
+    """Candidates of one location query, sorted by distance, and the current page."""
+    query_id: int
+    candidates: List[Dict[str, Any]]
+    user_coordinates: Dict[str, float]
+    position: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """Landmark on the current page."""
+        if self.position < len(self.candidates):
+            return self.candidates[self.position]
+        return None
+
+    def peek_next(self) -> Optional[Dict[str, Any]]:
+        """Landmark on the next page, without moving the cursor."""
+        if self.position + 1 < len(self.candidates):
+            return self.candidates[self.position + 1]
+        return None
+
+    def has_more(self) -> bool:
+        return self.position + 1 < len(self.candidates)
+
+
+class CursorStore:
+    """Bounded store of the latest cursor per chat, expiring after ``ttl`` seconds."""
+
+    def __init__(self, max_size: int = 10000, ttl: float = 1800) -> None:
+        """Initialize store limits."""
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cursors: "OrderedDict[int, NearbyCursor]" = OrderedDict()
+
+    def create(self, chat_id: int, candidates: List[Dict[str, Any]],
+               user_coordinates: Dict[str, float]) -> NearbyCursor:
+        """Store a new cursor for the chat, replacing any previous one."""
+        # Random, not sequential: ids must not repeat after a worker restarts
+        cursor = NearbyCursor(secrets.randbits(31), candidates, user_coordinates)
+        self._cursors[chat_id] = cursor
+        self._cursors.move_to_end(chat_id)
+        while len(self._cursors) > self.max_size:
+            self._cursors.popitem(last=False)
+        return cursor
+
+    def get(self, chat_id: int) -> Optional[NearbyCursor]:
+        """Return the chat's cursor or None if missing or expired."""
+        cursor = self._cursors.get(chat_id)
+        if cursor is None:
+            return None
+        if time.monotonic() - cursor.created_at > self.ttl:
+            del self._cursors[chat_id]
+            return None
+        self._cursors.move_to_end(chat_id)
+        return cursor
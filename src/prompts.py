@@ -0,0 +1,86 @@
+"""
+Prompt building for fact generation.
+
+The instructions are a constant system message so every request shares the
+same prefix (and can hit the provider's prompt cache); only the short
+per-landmark context, precomputed when the dataset loads, varies.
+"""
+
+import logging
+from typing import Dict, Any, Callable, List
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency, see pyproject "tokens" extra
+    tiktoken = None
+
+SYSTEM_PROMPT = (
+    "Ты увлекательный гид и эксперт по истории и культуре, который знает "
+    "интересные факты о достопримечательностях. Тебе дают название места, "
+    "его тип, расположение и краткое описание. Расскажи один интересный, "
+    "необычный или малоизвестный факт об этом месте.\n\n"
+    "Требования:\n"
+    "- Факт должен быть интересным и увлекательным\n"
+    "- Длина ответа: 2-3 предложения (максимум 200 символов)\n"
+    "- Используй простой и понятный язык\n"
+    "- Начни прямо с факта, без вводных слов\n"
+    "- Не упоминай координаты или техническую информацию"
+)
+
+SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
+
+# Rough characters-per-token ratio for mixed Russian/English text without tiktoken
+_CHARS_PER_TOKEN = 3
+
+
+def get_token_counter(model: str) -> Callable[[str], List[int]]:
+    """Return a function encoding text into tokens for the model.
+
+    Falls back to fixed-size character chunks when tiktoken is not installed.
+    """
+    if tiktoken is None:
+        return lambda text: list(range(0, len(text), _CHARS_PER_TOKEN))
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return encoding.encode
+
+
+def truncate_to_tokens(text: str, max_tokens: int, encode: Callable[[str], List[int]]) -> str:
+    """Cut text to at most ``max_tokens`` tokens, preferring a word boundary."""
+    if len(encode(text)) <= max_tokens:
+        return text
+
+    # Binary search for the longest prefix that fits the budget
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if len(encode(text[:middle])) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+
+    snippet = text[:low]
+    if ' ' in snippet:
+        snippet = snippet.rsplit(' ', 1)[0]
+    return snippet.rstrip(' ,;:') + "..."
+
+
+def build_landmark_context(landmark: Dict[str, Any], description_snippet: str) -> str:
+    """Build the variable user message for a landmark."""
+    place_type = landmark.get('type', 'достопримечательность')
+    country = landmark.get('country', 'Unknown')
+    city = landmark.get('city', 'Unknown')
+    location = ', '.join(part for part in (city, country) if part != 'Unknown')
+
+    lines = [f"Тип места: {place_type}"]
+    if location:
+        lines.append(f"Расположение: {location}")
+    if description_snippet:
+        lines.append(f"Краткое описание: {description_snippet}")
+    lines.append(f"Место: {landmark['name']}")
+    return '\n'.join(lines)
@@ -0,0 +1,299 @@
+"""
+Multi-process webhook mode.
+
+A front process receives Telegram webhook updates and hands them to N worker
+processes. Updates of one chat always go to the same worker, so per-chat state
+(live location sessions, "next place" cursors) stays local to a process.
+Workers share a read-only memory-mapped landmark index and a SQLite fact cache
+prepared by the front process.
+"""
+
+import asyncio
+import hmac
+import logging
+import multiprocessing
+import os
+import queue
+import resource
+import shutil
+import signal
+import tempfile
+import time
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlparse
+from aiohttp import web
+from telegram import Bot, Update
+from src.config import Config
+from src.fact_cache import SharedFactCache
+from src.http_transport import get_pool_stats
+from src.landmark_index import build_index
+from src.location_service import LocationService, load_landmarks_dataset, prepare_prompt_contexts
+from src.main import TelegramLocationBot
+
+logger = logging.getLogger(__name__)
+
+# Spawned (not forked) workers start with a clean interpreter and event loop
+_mp = multiprocessing.get_context("spawn")
+
+
+def route_update(data: Dict[str, Any], workers: int) -> int:
+    """Pick the worker for an update by its chat (or user) id."""
+    for key in ('message', 'edited_message', 'channel_post', 'edited_channel_post'):
+        if key in data:
+            return data[key]['chat']['id'] % workers
+
+    callback_query = data.get('callback_query')
+    if callback_query and callback_query.get('message'):
+        return callback_query['message']['chat']['id'] % workers
+
+    for value in data.values():
+        if isinstance(value, dict) and 'from' in value:
+            return value['from']['id'] % workers
+
+    return data.get('update_id', 0) % workers
+
+
+def worker_main(worker_id: int, index_path: str, fact_cache_path: str,
+                updates: Any, metrics: Any) -> None:
+    """Entry point of a worker process."""
+    # The front process handles signals and stops workers through their queue
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_run_worker(worker_id, index_path, fact_cache_path, updates, metrics))
+
+
+def _report_metrics(worker_id: int, application: Any, location_service: LocationService,
+                    counters: Dict[str, int], metrics: Any, started_at: float) -> None:
+    """Send this worker's metrics to the front process."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    metrics.put({
+        'worker_id': worker_id,
+        'pid': os.getpid(),
+        'uptime': round(time.monotonic() - started_at, 1),
+        'updates': counters['updates'],
+        'pending_updates': application.update_queue.qsize(),
+        'cpu_time': round(usage.ru_utime + usage.ru_stime, 2),
+        'max_rss_kb': usage.ru_maxrss,
+        'token_usage': dict(location_service.token_usage),
+        'http_pools': get_pool_stats(),
+        'reported_at': time.time()
+    })
+
+
+async def _run_worker(worker_id: int, index_path: str, fact_cache_path: str,
+                      updates: Any, metrics: Any) -> None:
+    """Feed updates from the front process into a bot application until stopped."""
+    location_service = LocationService(
+        landmark_index_path=index_path,
+        fact_cache=SharedFactCache(fact_cache_path, Config.FACT_CACHE_SIZE, Config.FACT_CACHE_TTL)
+    )
+    application = TelegramLocationBot(location_service=location_service, worker=True).application
+
+    counters = {'updates': 0}
+    started_at = time.monotonic()
+    last_report = started_at
+    loop = asyncio.get_running_loop()
+
+    async with application:
+        await application.start()
+        logger.info(f"Worker {worker_id} (pid {os.getpid()}) started")
+
+        while True:
+            try:
+                data = await loop.run_in_executor(
+                    None, updates.get, True, Config.WORKER_METRICS_INTERVAL
+                )
+            except queue.Empty:
+                data = {}  # no updates for a while, just report metrics
+
+            if data is None:
+                break
+            if data:
+                await application.update_queue.put(Update.de_json(data, application.bot))
+                counters['updates'] += 1
+
+            if time.monotonic() - last_report >= Config.WORKER_METRICS_INTERVAL:
+                _report_metrics(worker_id, application, location_service, counters, metrics,
+                                started_at)
+                last_report = time.monotonic()
+
+        # Application.stop() finishes the updates already queued
+        logger.info(f"Worker {worker_id} stopping after {counters['updates']} updates")
+        await application.stop()
+        _report_metrics(worker_id, application, location_service, counters, metrics, started_at)
+
+
+class WebhookDispatcher:
+    """Front process: receives webhooks, supervises workers, serves metrics."""
+
+    def __init__(self, workers: int) -> None:
+        """Initialize dispatcher for the given number of worker processes."""
+        self.config = Config()
+        self.workers = workers
+        self.state_dir = tempfile.mkdtemp(prefix="telegram-location-bot-")
+        self.index_path = os.path.join(self.state_dir, "landmarks.idx")
+        self.fact_cache_path = os.path.join(self.state_dir, "facts.sqlite")
+
+        self.queues: List[Any] = [_mp.Queue() for _ in range(workers)]
+        self.metrics_queue: Any = _mp.Queue()
+        self.processes: List[Optional[multiprocessing.process.BaseProcess]] = [None] * workers
+        self.restarts = [0] * workers
+        self.dispatched = [0] * workers
+        self.worker_metrics: Dict[int, Dict[str, Any]] = {}
+
+        self._restarting = False
+        self._stopping = False
+        self._supervisor: Optional[asyncio.Task] = None
+        self._restart_task: Optional[asyncio.Task] = None
+
+    def _prepare_shared_state(self) -> None:
+        """Build the landmark index and fact cache shared by all workers."""
+        landmarks = load_landmarks_dataset(self.config.LANDMARKS_PATH)
+        prepare_prompt_contexts(landmarks)
+        build_index(landmarks, self.index_path)
+        SharedFactCache(self.fact_cache_path)  # create schema before workers race for it
+        logger.info(f"Built shared landmark index with {len(landmarks)} landmarks")
+
+    def _start_worker(self, worker_id: int) -> None:
+        process = _mp.Process(
+            target=worker_main,
+            args=(worker_id, self.index_path, self.fact_cache_path,
+                  self.queues[worker_id], self.metrics_queue),
+            name=f"bot-worker-{worker_id}",
+            daemon=True
+        )
+        process.start()
+        self.processes[worker_id] = process
+
+    async def _stop_worker(self, worker_id: int) -> None:
+        """Ask a worker to finish its queued updates and exit, then reap it."""
+        process = self.processes[worker_id]
+        if process is None or not process.is_alive():
+            # A stop sentinel left in the queue would stop the replacement worker
+            return
+
+        self.queues[worker_id].put(None)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, process.join, self.config.WORKER_SHUTDOWN_TIMEOUT)
+        if process.is_alive():
+            logger.warning(f"Worker {worker_id} did not stop in time, terminating")
+            process.terminate()
+            await loop.run_in_executor(None, process.join)
+
+    async def rolling_restart(self) -> None:
+        """Restart workers one at a time; updates for a restarting worker wait in its queue."""
+        if self._restarting:
+            return
+        self._restarting = True
+        try:
+            for worker_id in range(self.workers):
+                logger.info(f"Restarting worker {worker_id}")
+                await self._stop_worker(worker_id)
+                self._start_worker(worker_id)
+                self.restarts[worker_id] += 1
+        finally:
+            self._restarting = False
+
+    def _on_sighup(self) -> None:
+        # Keep a reference: the loop holds tasks only weakly
+        if self._restart_task is None or self._restart_task.done():
+            self._restart_task = asyncio.create_task(self.rolling_restart())
+
+    def _drain_metrics(self) -> None:
+        while True:
+            try:
+                report = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.worker_metrics[report['worker_id']] = report
+
+    async def _supervise(self) -> None:
+        """Restart crashed workers and collect their metrics."""
+        while not self._stopping:
+            self._drain_metrics()
+            if not self._restarting:
+                for worker_id, process in enumerate(self.processes):
+                    if process is not None and not process.is_alive():
+                        logger.error(
+                            f"Worker {worker_id} exited with code {process.exitcode}, restarting"
+                        )
+                        self._start_worker(worker_id)
+                        self.restarts[worker_id] += 1
+            await asyncio.sleep(1)
+
+    async def _handle_update(self, request: web.Request) -> web.Response:
+        if self.config.WEBHOOK_SECRET and (
+                request.headers.get('X-Telegram-Bot-Api-Secret-Token') != self.config.WEBHOOK_SECRET):
+            return web.Response(status=403)
+
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        worker_id = route_update(data, self.workers)
+        self.queues[worker_id].put(data)
+        self.dispatched[worker_id] += 1
+        return web.Response()
+
+    async def _handle_metrics(self, request: web.Request) -> web.Response:
+        expected = f"Bearer {self.config.METRICS_TOKEN}".encode()
+        if not hmac.compare_digest(request.headers.get('Authorization', '').encode(), expected):
+            return web.Response(status=401)
+
+        self._drain_metrics()
+        workers = []
+        for worker_id, process in enumerate(self.processes):
+            workers.append({
+                'worker_id': worker_id,
+                'alive': bool(process and process.is_alive()),
+                'pid': process.pid if process else None,
+                'restarts': self.restarts[worker_id],
+                'dispatched': self.dispatched[worker_id],
+                'report': self.worker_metrics.get(worker_id)
+            })
+        return web.json_response({'workers': workers})
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def _on_startup(self, app: web.Application) -> None:
+        for worker_id in range(self.workers):
+            self._start_worker(worker_id)
+        self._supervisor = asyncio.create_task(self._supervise())
+
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, self._on_sighup)
+
+        async with Bot(self.config.TELEGRAM_BOT_TOKEN) as bot:
+            await bot.set_webhook(
+                url=self.config.WEBHOOK_URL,
+                secret_token=self.config.WEBHOOK_SECRET
+            )
+        logger.info(f"Webhook set to {self.config.WEBHOOK_URL}, {self.workers} workers started")
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        self._stopping = True
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+        if self._restart_task is not None:
+            # Let a restart in progress finish so it does not start workers after cleanup
+            await asyncio.gather(self._restart_task, return_exceptions=True)
+        await asyncio.gather(*(self._stop_worker(worker_id) for worker_id in range(self.workers)))
+        shutil.rmtree(self.state_dir, ignore_errors=True)
+        logger.info("All workers stopped")
+
+    def run(self) -> None:
+        """Prepare shared state, start workers and serve webhooks until stopped."""
+        self._prepare_shared_state()
+
+        webhook_path = urlparse(self.config.WEBHOOK_URL).path or "/"
+        app = web.Application()
+        app.router.add_post(webhook_path, self._handle_update)
+        if self.config.METRICS_TOKEN:
+            # Same public port as the webhook, so metrics are only served with a token
+            app.router.add_get("/metrics", self._handle_metrics)
+        app.router.add_get("/", self._handle_health)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+
+        web.run_app(app, host="0.0.0.0", port=self.config.PORT, print=None)
@@ -5,22 +5,47 @@ Wikipedia Parser for extracting landmark data with coordinates.
 import json
 import logging
 import argparse
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
 import time
+from src.http_cache import ResponseCache
+from src.deduplication import LandmarkDeduplicator
+from src.classification import ClassificationEngine
 
 
 class WikipediaParser:
     """Parser for extracting landmark data from Wikipedia API."""
     
-    def __init__(self) -> None:
+    def __init__(self, cache: Optional[ResponseCache] = None,
+                 classifier: Optional[ClassificationEngine] = None,
+                 pool_size: int = 10) -> None:
         self.base_url = "https://ru.wikipedia.org/w/api.php"
         self.en_base_url = "https://en.wikipedia.org/w/api.php"
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'TelegramLocationBot/1.0 (https://github.com/user/repo)'
         })
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.cache = cache
+        self.classifier = classifier or ClassificationEngine()
+        self.network_requests = 0  # requests that actually went to the API
+    
+    def _get_json(self, base_url: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Выполнить GET-запрос к API, используя кэш ответов, если он задан."""
+        if self.cache is not None:
+            sent_before = self.cache.stats['network']
+            data = self.cache.get_json(self.session, base_url, params)
+            self.network_requests += self.cache.stats['network'] - sent_before
+            return data
+        
+        self.network_requests += 1
+        response = self.session.get(base_url, params=params)
+        response.raise_for_status()
+        return response.json()
         
     def get_category_pages(self, category: str, limit: int = 50, lang: str = "ru") -> List[str]:
         """Получить список страниц из категории."""
@@ -36,9 +61,7 @@ class WikipediaParser:
         }
         
         try:
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(base_url, params)
             
             pages = []
             if 'query' in data and 'categorymembers' in data['query']:
@@ -53,33 +76,40 @@ class WikipediaParser:
     
     def get_page_coordinates(self, page_title: str, lang: str = "ru") -> Optional[Dict[str, float]]:
         """Извлечь координаты страницы."""
+        coordinates, _ = self.get_page_coordinates_and_wikidata_id(page_title, lang)
+        return coordinates
+    
+    def get_page_coordinates_and_wikidata_id(
+        self, page_title: str, lang: str = "ru"
+    ) -> Tuple[Optional[Dict[str, float]], Optional[str]]:
+        """Извлечь координаты и идентификатор Wikidata страницы одним запросом."""
         base_url = self.base_url if lang == "ru" else self.en_base_url
         
         params = {
             'action': 'query',
             'titles': page_title,
-            'prop': 'coordinates',
+            'prop': 'coordinates|pageprops',
+            'ppprop': 'wikibase_item',
             'format': 'json'
         }
         
         try:
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(base_url, params)
             
             if 'query' in data and 'pages' in data['query']:
                 for page_id, page_data in data['query']['pages'].items():
+                    wikidata_id = page_data.get('pageprops', {}).get('wikibase_item')
                     if 'coordinates' in page_data and page_data['coordinates']:
                         coord = page_data['coordinates'][0]
                         return {
                             'lat': coord['lat'],
                             'lon': coord['lon']
-                        }
-            return None
+                        }, wikidata_id
+            return None, None
             
         except requests.RequestException as e:
             logging.error(f"Error fetching coordinates for '{page_title}': {e}")
-            return None
+            return None, None
     
     def get_page_extract(self, page_title: str, lang: str = "ru") -> str:
         """Получить краткое описание страницы."""
@@ -96,9 +126,7 @@ class WikipediaParser:
         }
         
         try:
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(base_url, params)
             
             if 'query' in data and 'pages' in data['query']:
                 for page_id, page_data in data['query']['pages'].items():
@@ -126,9 +154,7 @@ class WikipediaParser:
         }
         
         try:
-            response = self.session.get(base_url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_json(base_url, params)
             
             categories = []
             if 'query' in data and 'pages' in data['query']:
@@ -154,30 +180,11 @@ class WikipediaParser:
     
     def classify_place_type(self, categories: List[str], title: str) -> str:
         """Определить тип места по категориям."""
-        title_lower = title.lower()
-        categories_lower = [cat.lower() for cat in categories]
-        
-        # Mapping categories to place types
-        if any(word in title_lower for word in ['музей', 'museum']):
-            return 'музей'
-        elif any(word in title_lower for word in ['парк', 'park', 'сад', 'garden']):
-            return 'парк'
-        elif any(word in title_lower for word in ['памятник', 'monument']):
-            return 'памятник'
-        elif any(word in title_lower for word in ['церковь', 'собор', 'храм', 'church', 'cathedral']):
-            return 'религиозное строение'
-        elif any(word in title_lower for word in ['площадь', 'square']):
-            return 'площадь'
-        elif any(word in title_lower for word in ['театр', 'theater', 'theatre']):
-            return 'театр'
-        elif any(word in title_lower for word in ['дворец', 'palace']):
-            return 'дворец'
-        else:
-            return 'достопримечательность'
+        return self.classifier.classify_place_type(title)
     
     def parse_landmark_data(self, page_title: str, lang: str = "ru") -> Optional[Dict[str, Any]]:
         """Полная информация о достопримечательности."""
-        coordinates = self.get_page_coordinates(page_title, lang)
+        coordinates, wikidata_id = self.get_page_coordinates_and_wikidata_id(page_title, lang)
         if not coordinates or not self.validate_coordinates(coordinates):
             return None
         
@@ -188,31 +195,8 @@ class WikipediaParser:
         categories = self.get_page_categories(page_title, lang)
         place_type = self.classify_place_type(categories, page_title)
         
-        # Determine country and city from categories or extract
-        country = "Unknown"
-        city = "Unknown"
-        
-        for cat in categories:
-            if 'москв' in cat.lower() or 'moscow' in cat.lower():
-                country = "Россия"
-                city = "Москва"
-                break
-            elif 'петербург' in cat.lower() or 'petersburg' in cat.lower():
-                country = "Россия"
-                city = "Санкт-Петербург"
-                break
-            elif 'париж' in cat.lower() or 'paris' in cat.lower():
-                country = "Франция"
-                city = "Париж"
-                break
-            elif 'нью-йорк' in cat.lower() or 'new york' in cat.lower():
-                country = "США"
-                city = "Нью-Йорк"
-                break
-            elif 'рим' in cat.lower() or 'rome' in cat.lower():
-                country = "Италия"
-                city = "Рим"
-                break
+        # Determine country and city from categories, falling back to coordinates
+        country, city = self.classifier.detect_location(categories, coordinates)
         
         base_url = self.base_url if lang == "ru" else self.en_base_url
         wiki_url = f"{base_url.replace('/w/api.php', '/wiki/')}{page_title.replace(' ', '_')}"
@@ -226,15 +210,18 @@ class WikipediaParser:
             'country': country,
             'city': city,
             'type': place_type,
-            'language': lang
+            'language': lang,
+            'wikidata_id': wikidata_id
         }
     
     def generate_test_dataset(self, categories: List[str], output_file: str, 
-                            limit_per_category: int = 10) -> None:
+                            limit_per_category: int = 10,
+                            dedup_radius_km: float = 0.015) -> None:
         """Создать тестовый датасет и сохранить в JSON."""
         logging.info(f"Starting dataset generation for {len(categories)} categories")
         
-        all_landmarks = []
+        # Duplicates are merged as records arrive, so only unique ones are kept
+        deduplicator = LandmarkDeduplicator(radius_km=dedup_radius_km)
         landmark_id = 1
         
         for category in categories:
@@ -247,28 +234,20 @@ class WikipediaParser:
             pages = self.get_category_pages(category, limit_per_category * 2, lang)
             
             for page_title in pages[:limit_per_category]:
+                sent_before = self.network_requests
                 landmark_data = self.parse_landmark_data(page_title, lang)
                 if landmark_data:
                     landmark_data['id'] = landmark_id
-                    all_landmarks.append(landmark_data)
-                    landmark_id += 1
-                    logging.info(f"Added landmark: {page_title}")
+                    if deduplicator.add(landmark_data):
+                        landmark_id += 1
+                        logging.info(f"Added landmark: {page_title}")
                 
-                # Rate limiting
-                time.sleep(0.1)
+                # Rate limiting, only if the page was not served entirely from cache
+                if self.network_requests > sent_before:
+                    time.sleep(0.1)
         
-        # Remove duplicates based on coordinates
-        unique_landmarks = []
-        seen_coords = set()
-        
-        for landmark in all_landmarks:
-            coord_key = (
-                round(landmark['coordinates']['lat'], 4),
-                round(landmark['coordinates']['lon'], 4)
-            )
-            if coord_key not in seen_coords:
-                seen_coords.add(coord_key)
-                unique_landmarks.append(landmark)
+        unique_landmarks = deduplicator.results()
+        logging.info(f"Merged {deduplicator.merged_count} duplicate landmarks")
         
         # Create final dataset
         dataset = {
@@ -327,6 +306,39 @@ def main() -> None:
         default="data/landmarks_dataset.json",
         help="Output file path"
     )
+    parser.add_argument(
+        "--dedup-radius",
+        type=float,
+        default=15.0,
+        help="Radius in meters within which landmarks are treated as duplicates"
+    )
+    parser.add_argument(
+        "--rules",
+        default=None,
+        help="JSON file with place type and city classification rules"
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="Path to SQLite response cache (disabled if not set)"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=7 * 24 * 3600,
+        help="Cache entry TTL in seconds before revalidation"
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Replay responses from cache only, without network access"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=10,
+        help="Connection pool size for Wikipedia API requests"
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -347,9 +359,21 @@ def main() -> None:
     else:
         categories = CATEGORIES_CONFIG[args.categories]
     
+    if args.offline and not args.cache:
+        parser.error("--offline requires --cache")
+    
+    cache = ResponseCache(args.cache, ttl=args.cache_ttl, offline=args.offline) if args.cache else None
+    
     # Initialize parser and generate dataset
-    wiki_parser = WikipediaParser()
-    wiki_parser.generate_test_dataset(categories, args.output, args.limit)
+    classifier = ClassificationEngine.from_file(args.rules) if args.rules else None
+    wiki_parser = WikipediaParser(cache=cache, classifier=classifier, pool_size=args.pool_size)
+    try:
+        wiki_parser.generate_test_dataset(
+            categories, args.output, args.limit, dedup_radius_km=args.dedup_radius / 1000
+        )
+    finally:
+        if cache is not None:
+            cache.close()
     
     print(f"Dataset generation completed. Output saved to: {args.output}")
 
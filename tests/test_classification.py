@@ -0,0 +1,91 @@
+"""
+Tests for the compiled keyword classifier.
+"""
+
+import random
+
+import pytest
+
+from src.classification import (
+    DEFAULT_RULES,
+    UNKNOWN,
+    ClassificationEngine,
+    KeywordMatcher,
+    _naive_city,
+    _naive_classify,
+)
+
+
+def _random_word(rng: random.Random, alphabet: str, max_len: int) -> str:
+    return ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, max_len)))
+
+
+def _random_rules(rng: random.Random) -> dict:
+    """Rules over a tiny alphabet, so keywords overlap and nest all the time."""
+    alphabet = "abc"
+    return {
+        "default_type": "default",
+        "place_types": [
+            {"type": f"type{i}", "keywords": [_random_word(rng, alphabet, 4)
+                                              for _ in range(rng.randint(1, 3))]}
+            for i in range(rng.randint(1, 5))
+        ],
+        "cities": [
+            {"city": f"city{i}", "country": "country", "keywords": [_random_word(rng, alphabet, 4)
+                                                                    for _ in range(rng.randint(1, 3))]}
+            for i in range(rng.randint(1, 5))
+        ],
+    }
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_engine_matches_naive_scan(seed):
+    rng = random.Random(seed)
+    rules = _random_rules(rng)
+    engine = ClassificationEngine(rules)
+
+    for _ in range(30):
+        title = _random_word(rng, "abcABC ", 12)
+        assert engine.classify_place_type(title) == _naive_classify(rules, title), title
+
+        categories = [_random_word(rng, "abc ", 10) for _ in range(rng.randint(0, 3))]
+        city = engine.city_from_categories(categories)
+        assert (city["city"] if city else UNKNOWN) == _naive_city(rules, categories), categories
+
+
+def test_higher_priority_keyword_inside_longer_match_wins():
+    # The alternation matches "посад" first; "сад" inside it has higher priority
+    matcher = KeywordMatcher([["сад"], ["посад"]])
+    assert matcher.best_rank("посад") == 0
+
+
+def test_higher_priority_keyword_overlapping_match_wins():
+    # "abc" is found first and hides the overlapping, higher-priority "cd"
+    matcher = KeywordMatcher([["cd"], ["abc"]])
+    assert matcher.best_rank("abcd") == 0
+
+
+def test_keyword_listed_twice_keeps_first_group():
+    matcher = KeywordMatcher([["сад"], ["сад", "парк"]])
+    assert matcher.best_rank("летний сад") == 0
+
+
+def test_no_keywords_and_no_match():
+    assert KeywordMatcher([]).best_rank("музей") is None
+    assert KeywordMatcher([["музей"]]).best_rank("собор") is None
+
+
+def test_default_rules_order():
+    engine = ClassificationEngine()
+    assert engine.classify_place_type("Музей-парк Коломенское") == "музей"
+    assert engine.classify_place_type("Исаакиевский собор") == "религиозное строение"
+    assert engine.classify_place_type("Красная площадь") == "площадь"
+    assert engine.classify_place_type("Эйфелева башня") == DEFAULT_RULES["default_type"]
+
+
+def test_detect_location_prefers_categories_over_coordinates():
+    engine = ClassificationEngine()
+    paris = {'lat': 48.8584, 'lon': 2.2945}
+    assert engine.detect_location(["Музеи Москвы"], paris) == ("Россия", "Москва")
+    assert engine.detect_location([], paris) == ("Франция", "Париж")
+    assert engine.detect_location([], {'lat': 0.0, 'lon': 0.0}) == (UNKNOWN, UNKNOWN)
@@ -0,0 +1,132 @@
+"""
+Tests for streaming landmark deduplication.
+"""
+
+import math
+
+from src.deduplication import LandmarkDeduplicator, normalize_title
+from src.geo import haversine_km
+
+
+def _landmark(name, lat, lon, **fields):
+    landmark = {
+        'name': name,
+        'coordinates': {'lat': lat, 'lon': lon},
+        'description': '',
+        'categories': [],
+        'country': 'Unknown',
+        'city': 'Unknown',
+    }
+    landmark.update(fields)
+    return landmark
+
+
+def test_normalize_title():
+    assert normalize_title("Троицкий Собор (Москва)") == "троицкий собор"
+    assert normalize_title("Ёлочный  базар!") == "елочный базар"
+
+
+def test_points_straddling_a_cell_boundary_are_merged():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    boundary = math.floor(55.75 / deduplicator.cell_deg) * deduplicator.cell_deg
+    below = _landmark("Фонтан", boundary - 1e-6, 37.6)
+    above = _landmark("Fountain", boundary + 1e-6, 37.6)
+    assert deduplicator._cell(55.75, 37.6) != deduplicator._cell(boundary - 1e-6, 37.6)
+    assert deduplicator._cell(boundary - 1e-6, 37.6) != deduplicator._cell(boundary + 1e-6, 37.6)
+
+    assert deduplicator.add(below)
+    assert not deduplicator.add(above)
+    assert len(deduplicator.results()) == 1
+
+
+def test_high_latitude_neighbours_several_columns_apart_are_merged():
+    # At 70° a degree of longitude is ~3x shorter, so 10 m spans two grid columns
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    lat = 70.0
+    offset = 0.005 / (111.32 * math.cos(math.radians(lat)))
+    west = _landmark("Маяк", lat, 25.0 - offset)
+    east = _landmark("Lighthouse", lat, 25.0 + offset)
+    west_col = deduplicator._cell(lat, 25.0 - offset)[1]
+    east_col = deduplicator._cell(lat, 25.0 + offset)[1]
+    assert east_col - west_col >= 2
+    assert haversine_km(lat, 25.0 - offset, lat, 25.0 + offset) <= 0.015
+
+    assert deduplicator.add(west)
+    assert not deduplicator.add(east)
+
+
+def test_points_beyond_radius_are_kept():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    assert deduplicator.add(_landmark("Фонтан", 55.75, 37.6))
+    assert deduplicator.add(_landmark("Скамейка", 55.75 + 0.0003, 37.6))  # ~33 m
+    assert deduplicator.merged_count == 0
+
+
+def test_ru_and_en_pages_merge_by_wikidata_id():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    hermitage_ru = _landmark(
+        "Эрмитаж", 59.9398, 30.3146,
+        description="Музей изобразительного искусства.",
+        categories=["Музеи Санкт-Петербурга"],
+        wikipedia_url="https://ru.wikipedia.org/wiki/Эрмитаж",
+        language="ru", wikidata_id="Q132783",
+    )
+    hermitage_en = _landmark(
+        "Hermitage Museum", 59.9410, 30.3129,  # ~160 m away, different title
+        description="The State Hermitage Museum is a museum of art and culture in Saint Petersburg.",
+        categories=["Art museums in Saint Petersburg"],
+        wikipedia_url="https://en.wikipedia.org/wiki/Hermitage_Museum",
+        city="Санкт-Петербург", country="Россия",
+        language="en", wikidata_id="Q132783",
+    )
+
+    assert deduplicator.add(hermitage_ru)
+    assert not deduplicator.add(hermitage_en)
+
+    kept, = deduplicator.results()
+    assert kept['name'] == "Эрмитаж"
+    assert kept['language'] == "ru"
+    assert kept['description'] == "Музей изобразительного искусства."
+    assert kept['categories'] == ["Музеи Санкт-Петербурга", "Art museums in Saint Petersburg"]
+    assert kept['city'] == "Санкт-Петербург"
+    assert kept['alternate_urls'] == ["https://en.wikipedia.org/wiki/Hermitage_Museum"]
+
+
+def test_merge_takes_longer_description_in_same_language_or_fills_empty():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    deduplicator.add(_landmark("Собор", 55.0, 37.0, language="ru", description=""))
+    deduplicator.add(_landmark("Cathedral", 55.0, 37.0, language="en", description="English text"))
+    assert deduplicator.results()[0]['description'] == "English text"
+
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    deduplicator.add(_landmark("Собор", 55.0, 37.0, language="ru", description="Коротко"))
+    deduplicator.add(_landmark("Собор", 55.0, 37.0, language="ru", description="Подробное описание"))
+    assert deduplicator.results()[0]['description'] == "Подробное описание"
+
+
+def test_same_title_with_different_wikidata_ids_are_kept_apart():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    assert deduplicator.add(_landmark("Троицкий собор", 55.0, 37.0, wikidata_id="Q1"))
+    # Within the title-match radius
+    assert deduplicator.add(_landmark("Троицкий собор", 55.005, 37.0, wikidata_id="Q2"))
+    # Within the spatial radius as well
+    assert deduplicator.add(_landmark("Троицкий собор", 55.0, 37.0001, wikidata_id="Q3"))
+    assert len(deduplicator.results()) == 3
+
+
+def test_same_title_without_wikidata_ids_merges_only_nearby():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    assert deduplicator.add(_landmark("Памятник Пушкину", 55.7652, 37.6058))
+    assert not deduplicator.add(_landmark("Памятник Пушкину", 55.7700, 37.6058))  # ~530 m
+    assert deduplicator.add(_landmark("Памятник Пушкину", 59.9311, 30.3609))  # other city
+    assert deduplicator.merged_count == 1
+
+
+def test_adopted_wikidata_id_matches_later_records():
+    deduplicator = LandmarkDeduplicator(radius_km=0.015)
+    deduplicator.add(_landmark("Большой театр", 55.7601, 37.6186))
+    deduplicator.add(_landmark("Большой театр", 55.7601, 37.6186, wikidata_id="Q463"))
+    assert not deduplicator.add(_landmark("Bolshoi Theatre", 55.7700, 37.6186, wikidata_id="Q463"))
+    kept, = deduplicator.results()
+    assert kept['wikidata_id'] == "Q463"
+    assert deduplicator.merged_count == 2